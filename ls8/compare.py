@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+"""
+Check that every way of running the LS-8 gives the same results.
+
+Runs each program in examples/ plus a few edge-case programs under every
+available backend (specialized programs, numba, a Cython build), and
+compares what each prints, its exit status and the final CPU state against
+plain-Python `run_loop()`:
+
+    python3 compare.py
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from cpu import *
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Loads and runs one program, then prints the final CPU state. `{setup}`
+# runs before cpu is imported and `{after_load}` right after load().
+RUNNER = '''
+import sys
+{setup}
+import cpu
+c = cpu.CPU()
+c.load(sys.argv[1])
+{after_load}
+{patch}
+try:
+    c.run()
+finally:
+    print("state", c.pc, c.flag, list(c.registers))
+'''
+
+# name -> (setup, after_load, directory holding the cpu module)
+BACKENDS = {
+    "python": ("sys.modules['numba'] = None", "c.program_length = None", HERE),
+    "specialized": ("sys.modules['numba'] = None", "assert c.program_length is not None", HERE),
+}
+try:
+    import numba
+    BACKENDS["numba"] = ("", "", HERE)
+except ImportError:
+    print("numba not installed; skipping the numba backend")
+
+EDGE_PROGRAMS = {
+    # shifts of 8 or more clear the register on every backend
+    "shifts.ls8": [
+        LDI, 0, 1, LDI, 1, 64, SHL, 0, 1, PRN, 0,
+        LDI, 0, 1, LDI, 1, 33, SHL, 0, 1, PRN, 0,
+        LDI, 0, 128, LDI, 1, 65, SHR, 0, 1, PRN, 0,
+        LDI, 0, 3, LDI, 1, 2, SHL, 0, 1, PRN, 0,
+        HLT,
+    ],
+    # register operands only use their low 3 bits
+    "registers.ls8": [
+        LDI, 200, 9, PRN, 200,
+        LDI, 20, 7, PRN, 4,
+        HLT,
+    ],
+    # 8-bit wraparound, then a trap on DIV by zero
+    "alu.ls8": [
+        LDI, 0, 3, LDI, 1, 5, SUB, 0, 1, PRN, 0,
+        LDI, 2, 7, LDI, 3, 4, MOD, 2, 3, PRN, 2,
+        NOT, 2, PRN, 2, MUL, 0, 0, PRN, 0,
+        DIV, 0, 4,
+        HLT,
+    ],
+    # an instruction at address 255 takes its operand from address 0
+    "wrap.ls8": [LDI, 0, 255, JMP, 0] + [0] * 250 + [PRN],
+}
+
+# example program -> statement run between load() and run()
+PATCHES = {
+    # RAM changed after load() must be what runs (print8 prints 9, not 8)
+    "print8.ls8": "c.ram_write(9, 2)",
+}
+
+
+def write_program(path, words):
+    """Write `words` out in the .ls8 format load() reads."""
+    with open(path, "w") as f:
+        f.writelines(f"{word:08b}\n" for word in words)
+
+
+def build_cython(tmp):
+    """
+    Compile cpu.py with Cython into a directory under `tmp` and register it
+    as a backend. Skipped when Cython is not installed.
+    """
+    try:
+        import Cython
+    except ImportError:
+        print("Cython not installed; skipping the Cython backend")
+        return
+
+    build = os.path.join(tmp, "cython")
+    os.mkdir(build)
+    for name in ("cpu.py", "cpu.pxd"):
+        shutil.copy(os.path.join(HERE, name), build)
+    subprocess.run([sys.executable, "-m", "Cython.Build.Cythonize", "-3", "-i", "cpu.py"],
+                   cwd=build, check=True, capture_output=True)
+    # make sure the extension, not cpu.py, is what gets imported
+    BACKENDS["cython"] = ("", "assert not cpu.__file__.endswith('.py')", build)
+
+
+def run(backend, program, patch=""):
+    """Run `program` under `backend`; return what it printed and its exit status."""
+    setup, after_load, cwd = BACKENDS[backend]
+    code = RUNNER.format(setup=setup, after_load=after_load, patch=patch)
+    result = subprocess.run([sys.executable, "-c", code, program],
+                            cwd=cwd, capture_output=True, text=True)
+    # tracebacks differ in paths and line numbers; keep only the exception
+    error = result.stderr.strip().splitlines()[-1:] if result.stderr else []
+    return result.stdout, error, result.returncode
+
+
+def main():
+    examples = os.path.join(HERE, "examples")
+    # (label, program, patch)
+    cases = [(name, os.path.join(examples, name), "")
+             for name in sorted(os.listdir(examples))]
+    cases += [(f"{name} + {patch}", os.path.join(examples, name), patch)
+              for name, patch in PATCHES.items()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        build_cython(tmp)
+        for name, words in EDGE_PROGRAMS.items():
+            cases.append((name, os.path.join(tmp, name), ""))
+            write_program(cases[-1][1], words)
+
+        failures = 0
+        for name, program, patch in cases:
+            expected = run("python", program, patch)
+            mismatched = False
+            for backend in BACKENDS:
+                if backend == "python":
+                    continue
+                got = run(backend, program, patch)
+                if got != expected:
+                    mismatched = True
+                    print(f"MISMATCH {name} [{backend}]")
+                    print(f"  python: {expected}")
+                    print(f"  {backend}: {got}")
+            failures += mismatched
+            if not mismatched:
+                print(f"ok {name}")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
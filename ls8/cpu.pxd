@@ -0,0 +1,22 @@
+# Static types for compiling cpu.py with Cython, an ahead-of-time
+# alternative to the numba JIT:
+#
+#     cythonize -3 -i cpu.py
+#
+# The built extension is picked up by `from cpu import *` in place of cpu.py.
+# Bounds checking on the RAM and register views is switched off by the
+# directive comment at the top of cpu.py; run_loop() masks every index into
+# range, so it never needs the check.
+
+cimport cython
+
+cdef int HLT, LDI, PRN
+cdef int ADD, SUB, MUL, DIV
+cdef int POP, PUSH, CALL, RET, SP
+cdef int CMP, JMP, JEQ, JNE
+cdef int AND, OR, XOR, NOT, SHL, SHR, MOD
+
+@cython.locals(ir=cython.uchar, operand_a=cython.uchar, operand_b=cython.uchar,
+               sp=cython.uchar, shift=cython.uchar,
+               fl_l=cython.bint, fl_g=cython.bint, fl_e=cython.bint)
+cpdef tuple run_loop(unsigned char[:] ram, unsigned char[:] registers, int pc, int flag)
@@ -1,6 +1,15 @@
+# cython: boundscheck=False, wraparound=False
 """CPU functionality."""
 
+import re
 import sys
+from array import array
+from types import FunctionType
+
+try:
+    from numba import njit
+except ImportError:                     # numba is optional; run_loop stays plain Python
+    njit = None
 
 HLT = 0b00000001
 LDI = 0b10000010
@@ -37,17 +46,326 @@ SHL = 0b10101100
 SHR = 0b10101101
 MOD = 0b10100100
 
+def run_loop(ram, registers, pc, flag):
+    """
+    Fetch, decode and execute instructions until the CPU stops.
+    Instructions are dispatched with a single `if-elif` cascade, ordered by
+    how often each opcode executes across the example programs, so the most
+    frequent ones are tested first. ALU results are masked to 8 bits, as on
+    the real hardware.
+
+    Register operands use only their low 3 bits and addresses wrap at 256,
+    so every `ram`/`registers` index is in range by construction; the
+    compiled builds rely on this to run without bounds checks.
+
+    The FL register is unpacked into one boolean per flag while running.
+    Returns the final `(pc, flag, ir)`; `ir` is `HLT` on a clean halt,
+    `DIV`/`MOD` if the divisor was zero, otherwise the opcode that could
+    not be decoded.
+    """
+    pc &= 0xFF
+    fl_l = (flag & 0b100) != 0                  # FL is 00000LGE
+    fl_g = (flag & 0b010) != 0
+    fl_e = (flag & 0b001) != 0
+
+    while True:
+        ir = ram[pc]                            # Instruction Register (IR)
+
+        if ir == LDI:                           # store value in register
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            operand_b = ram[(pc + 2) & 0xFF]
+            registers[operand_a] = operand_b
+            pc = (pc + 3) & 0xFF
+        elif ir == PRN:                         # print value in register
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            print(registers[operand_a])
+            pc = (pc + 2) & 0xFF
+        elif ir == ADD:
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            operand_b = ram[(pc + 2) & 0xFF] & 0b111
+            registers[operand_a] = (registers[operand_a] + registers[operand_b]) & 0xFF
+            pc = (pc + 3) & 0xFF
+        elif ir == PUSH:
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            sp = (registers[SP] - 1) & 0xFF
+            registers[SP] = sp
+            ram[sp] = registers[operand_a]
+            pc = (pc + 2) & 0xFF
+        elif ir == JMP:
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            pc = registers[operand_a]
+        elif ir == CMP:
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            operand_b = ram[(pc + 2) & 0xFF] & 0b111
+            fl_l = registers[operand_a] < registers[operand_b]
+            fl_g = registers[operand_a] > registers[operand_b]
+            fl_e = registers[operand_a] == registers[operand_b]
+            pc = (pc + 3) & 0xFF
+        elif ir == CALL:
+            # push the address of the instruction after CALL, then jump
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            sp = (registers[SP] - 1) & 0xFF
+            registers[SP] = sp
+            ram[sp] = (pc + 2) & 0xFF
+            pc = registers[operand_a]
+        elif ir == RET:
+            # pop the return address into the PC
+            sp = registers[SP]
+            pc = ram[sp]
+            registers[SP] = (sp + 1) & 0xFF
+        elif ir == JEQ:                         # jump if `equal` flag is set
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            if fl_e:
+                pc = registers[operand_a]
+            else:
+                pc = (pc + 2) & 0xFF
+        elif ir == JNE:                         # jump if `equal` flag is clear
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            if not fl_e:
+                pc = registers[operand_a]
+            else:
+                pc = (pc + 2) & 0xFF
+        elif ir == POP:
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            sp = registers[SP]
+            registers[operand_a] = ram[sp]
+            registers[SP] = (sp + 1) & 0xFF
+            pc = (pc + 2) & 0xFF
+        elif ir == MUL:
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            operand_b = ram[(pc + 2) & 0xFF] & 0b111
+            registers[operand_a] = (registers[operand_a] * registers[operand_b]) & 0xFF
+            pc = (pc + 3) & 0xFF
+        elif ir == SUB:
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            operand_b = ram[(pc + 2) & 0xFF] & 0b111
+            registers[operand_a] = (registers[operand_a] - registers[operand_b]) & 0xFF
+            pc = (pc + 3) & 0xFF
+        elif ir == DIV:
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            operand_b = ram[(pc + 2) & 0xFF] & 0b111
+            if registers[operand_b] == 0:       # divide by zero traps
+                break
+            registers[operand_a] = (registers[operand_a] // registers[operand_b]) & 0xFF
+            pc = (pc + 3) & 0xFF
+        elif ir == MOD:
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            operand_b = ram[(pc + 2) & 0xFF] & 0b111
+            if registers[operand_b] == 0:
+                break
+            registers[operand_a] = registers[operand_a] % registers[operand_b]
+            pc = (pc + 3) & 0xFF
+        elif ir == AND:
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            operand_b = ram[(pc + 2) & 0xFF] & 0b111
+            registers[operand_a] = registers[operand_a] & registers[operand_b]
+            pc = (pc + 3) & 0xFF
+        elif ir == OR:
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            operand_b = ram[(pc + 2) & 0xFF] & 0b111
+            registers[operand_a] = registers[operand_a] | registers[operand_b]
+            pc = (pc + 3) & 0xFF
+        elif ir == XOR:
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            operand_b = ram[(pc + 2) & 0xFF] & 0b111
+            registers[operand_a] = registers[operand_a] ^ registers[operand_b]
+            pc = (pc + 3) & 0xFF
+        elif ir == NOT:
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            registers[operand_a] = ~registers[operand_a] & 0xFF
+            pc = (pc + 2) & 0xFF
+        elif ir == SHL:
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            operand_b = ram[(pc + 2) & 0xFF] & 0b111
+            shift = registers[operand_b]        # wider shifts are undefined in C/LLVM
+            registers[operand_a] = (registers[operand_a] << shift) & 0xFF if shift < 8 else 0
+            pc = (pc + 3) & 0xFF
+        elif ir == SHR:
+            operand_a = ram[(pc + 1) & 0xFF] & 0b111
+            operand_b = ram[(pc + 2) & 0xFF] & 0b111
+            shift = registers[operand_b]
+            registers[operand_a] = registers[operand_a] >> shift if shift < 8 else 0
+            pc = (pc + 3) & 0xFF
+        else:                                   # HLT, or an unknown opcode
+            break
+
+    flag = (0b100 if fl_l else 0) | (0b010 if fl_g else 0) | (0b001 if fl_e else 0)
+    return pc, flag, ir
+
+
+# a Cython build (see cpu.pxd) is already compiled, so only JIT plain Python
+if njit is not None and isinstance(run_loop, FunctionType):
+    run_loop = njit(cache=True, boundscheck=False)(run_loop)
+    # compile at import so JIT time stays out of the first run()
+    _warmup = bytearray(256)
+    _warmup[0] = HLT
+    run_loop(_warmup, array('B', [0] * 8), 0, 0)
+    del _warmup
+
+
+# Source templates for the register-only instructions; `{a}`/`{b}` are the
+# operands, already decoded at translation time.
+_REGISTER_SOURCE = {
+    LDI: ["registers[{a}] = {b}"],
+    PRN: ["print(registers[{a}])"],
+    ADD: ["registers[{a}] = (registers[{a}] + registers[{b}]) & 0xFF"],
+    SUB: ["registers[{a}] = (registers[{a}] - registers[{b}]) & 0xFF"],
+    MUL: ["registers[{a}] = (registers[{a}] * registers[{b}]) & 0xFF"],
+    AND: ["registers[{a}] = registers[{a}] & registers[{b}]"],
+    OR: ["registers[{a}] = registers[{a}] | registers[{b}]"],
+    XOR: ["registers[{a}] = registers[{a}] ^ registers[{b}]"],
+    NOT: ["registers[{a}] = ~registers[{a}] & 0xFF"],
+    SHL: ["registers[{a}] = (registers[{a}] << registers[{b}]) & 0xFF"],
+    SHR: ["registers[{a}] = registers[{a}] >> registers[{b}]"],
+    CMP: [
+        "x = registers[{a}]",
+        "y = registers[{b}]",
+        "fl_l = x < y",
+        "fl_g = x > y",
+        "fl_e = x == y",
+    ],
+    POP: [
+        "sp = registers[{sp}]",
+        "registers[{a}] = ram[sp]",
+        "registers[{sp}] = (sp + 1) & 0xFF",
+    ],
+}
+
+
+def _translate_block(code, length, addr, entries):
+    """
+    Yield source lines for the straight-line run of instructions starting
+    at `addr`. The block ends at an unconditional transfer of control, or
+    by jumping to the next entry point.
+    """
+    start = addr
+    while True:
+        if addr >= length:                      # ran off the end of the program
+            yield f"pc = {addr}"
+            yield "break"
+            return
+        if addr in entries and addr != start:
+            yield f"pc = {addr}"
+            yield "continue"
+            return
+
+        ir, a, b = code[addr], code[addr + 1] & 0b111, code[addr + 2]
+        if ir != LDI:                           # only LDI takes an immediate
+            b &= 0b111
+        next_addr = addr + ((ir >> 6) & 0b11) + 1
+
+        if ir in _REGISTER_SOURCE:
+            for line in _REGISTER_SOURCE[ir]:
+                yield line.format(a=a, b=b, sp=SP)
+        elif ir == JEQ or ir == JNE:
+            yield f"if {'' if ir == JEQ else 'not '}fl_e:"
+            yield f"    pc = registers[{a}]"
+            yield "    continue"
+        elif ir == DIV or ir == MOD:
+            yield f"if registers[{b}] == 0:"
+            yield f"    pc, ir = {addr}, {ir}"
+            yield "    break"
+            if ir == DIV:
+                yield f"registers[{a}] = (registers[{a}] // registers[{b}]) & 0xFF"
+            else:
+                yield f"registers[{a}] = registers[{a}] % registers[{b}]"
+        elif ir == PUSH:
+            yield f"sp = (registers[{SP}] - 1) & 0xFF"
+            yield f"registers[{SP}] = sp"
+            yield f"ram[sp] = registers[{a}]"
+            yield f"if sp < {length}:"        # wrote over the program
+            yield f"    pc = {next_addr}"
+            yield "    break"
+        elif ir == CALL:
+            yield f"sp = (registers[{SP}] - 1) & 0xFF"
+            yield f"registers[{SP}] = sp"
+            yield f"ram[sp] = {next_addr & 0xFF}"
+            yield f"pc = registers[{a}]"
+            yield f"if sp < {length}:"
+            yield "    break"
+            yield "continue"
+            return
+        elif ir == JMP:
+            yield f"pc = registers[{a}]"
+            yield "continue"
+            return
+        elif ir == RET:
+            yield f"sp = registers[{SP}]"
+            yield "pc = ram[sp]"
+            yield f"registers[{SP}] = (sp + 1) & 0xFF"
+            yield "continue"
+            return
+        elif ir == HLT:
+            yield f"pc, ir = {addr}, {HLT}"
+            yield "break"
+            return
+        else:                                   # let run_loop() report it
+            yield f"pc = {addr}"
+            yield "break"
+            return
+
+        addr = next_addr
+
+
+def specialize(ram, length):
+    """
+    Translate the program in the first `length` bytes of RAM into a Python
+    function with the same arguments as `run_loop()`, so instructions are
+    decoded once here instead of on every cycle.
+
+    Jumps go through registers, so the generated function has one block per
+    likely target (the start, CALL return points and addresses loaded with
+    LDI) and a dispatcher over them. It returns `(pc, flag, ir)` like
+    `run_loop()`, except that `ir` is `None` whenever it cannot carry on:
+    a jump to an address that is not a block, an unknown opcode, or a stack
+    write into the program. `run_loop()` then continues from `pc`.
+    """
+    code = bytes(ram) + bytes(ram[:2])          # operand fetches wrap past address 255
+
+    starts = set()
+    addr = 0
+    while addr < length:
+        starts.add(addr)
+        addr += ((code[addr] >> 6) & 0b11) + 1
+
+    entries = {0}
+    for addr in starts:
+        if code[addr] == LDI and code[addr + 2] in starts:
+            entries.add(code[addr + 2])
+        elif code[addr] == CALL:
+            entries.add(addr + 2)
+
+    lines = [
+        "def run_program(ram, registers, pc, flag):",
+        "    fl_l = (flag & 0b100) != 0",
+        "    fl_g = (flag & 0b010) != 0",
+        "    fl_e = (flag & 0b001) != 0",
+        "    ir = None",
+        "    while True:",
+    ]
+    for n, entry in enumerate(sorted(entries)):
+        lines.append(f"        {'elif' if n else 'if'} pc == {entry}:")
+        lines.extend("            " + line for line in _translate_block(code, length, entry, entries))
+    lines.append("        break")
+    lines.append("    flag = (0b100 if fl_l else 0) | (0b010 if fl_g else 0) | (0b001 if fl_e else 0)")
+    lines.append("    return pc, flag, ir")
+
+    namespace = {}
+    exec(compile("\n".join(lines), "<ls8 program>", "exec"), namespace)
+    return namespace["run_program"]
+
+
 class CPU:
     """Main CPU class."""
 
     def __init__(self):
         """
         Construct a new CPU.
-        Add list properties to the `CPU` class to hold 256 bytes of memory and 8
-        general-purpose registers.
+        Memory is a `bytearray` of 256 unsigned bytes, and the 8
+        general-purpose registers are a typed `array` of unsigned bytes.
         """
-        self.ram = [0] * 256                # 256 bytes of memory
-        self.registers = [0] * 8            # 8 registers
+        self.ram = bytearray(256)           # 256 bytes of memory
+        self.registers = array('B', [0] * 8)    # 8 registers
         self.registers[7] = 0xF4
         self.pc = 0                         # program counter
         self.ir = 0                         # Instruction Register (IR)
@@ -55,268 +373,63 @@ class CPU:
         self.halted = False
 
         self.flag = 0
-        self.inst_set_pc = False            # Some instructions set the PC directly [CALL, JMP, JEQ, JNE]
-
-        #  Table for fast lookups
-        self.execute = {
-            HLT: self.execute_HLT,
-            LDI: self.execute_LDI,
-            PRN: self.execute_PRN,
-
-            PUSH: self.execute_PUSH,
-            POP: self.execute_POP,
-
-            CALL: self.execute_CALL,
-            RET: self.execute_RET,
-
-            ADD: self.execute_ADD,
-            SUB: self.execute_SUB,
-            MUL: self.execute_MUL,
-            DIV: self.execute_DIV,
-
-            CMP: self.execute_CMP,
-            JMP: self.execute_JMP,
-            JEQ: self.execute_JEQ,
-            JNE: self.execute_JNE,
-
-            AND: self.execute_AND,
-            OR: self.execute_OR,
-            XOR: self.execute_XOR,
-            NOT: self.execute_NOT,
-            SHL: self.execute_SHL,
-            SHR: self.execute_SHR,
-            MOD: self.execute_MOD,
-        }
+
+        self.program_length = None          # set by load(); run() may specialize the program
 
     def load(self, filename):
         """Load a program into memory."""
-
-        address = 0
-        # open the file
-        with open(sys.argv[1]) as my_file:
-            # go through each line to parse and get
-            # the instruction
-            for line in my_file:
-                # try and get the instruction/operand in the line
-                comment_split = line.split("#")
-                maybe_binary_number = comment_split[0].strip()
-                if maybe_binary_number == '':
-                    continue
-                val = int(maybe_binary_number, 2)
-
-                self.ram[address] = val
-                address += 1
-
-    def alu(self, op, reg_a, reg_b):
-        """
-        ALU operations
-        Arithmetic Logic Operator
-        """
-        ops = {
-            "ADD": lambda x, y: x + y,
-            "SUB": lambda x, y: x - y,
-            "MUL": lambda x, y: x * y,
-            "DIV": lambda x, y: x / y,
-            # Day 2 notes !!!
-            "AND": lambda x, y: x & y,
-            "OR": lambda x, y: x | y,
-            "XOR": lambda x, y: x ^ y,
-            "NOT": lambda x: ~x,
-            "SHL": lambda x, y: x << y,
-            "SHR": lambda x, y: x >> y,
-            "MOD": lambda x, y: x % y,
-        }
-        try:
-            if op in ops:
-                self.registers[reg_a] = ops[op](self.registers[reg_a], self.registers[reg_b])
-                return self.registers[reg_a]
-        except:
-            raise Exception("Unsupported ALU operation")
-
+        with open(filename) as my_file:
+            program = my_file.read()
+
+        # every non-blank line holds one instruction/operand, optionally
+        # followed by a `#` comment; comment-only lines never match
+        matches = list(re.finditer(r'^[^\S\n]*([^#\s][^#\n]*?)[^\S\n]*(?:#.*)?$',
+                                   program, re.MULTILINE))
+        for match in matches:
+            if not re.fullmatch(r'[01]{8}', match[1]):
+                line = program.count('\n', 0, match.start()) + 1
+                print(f"Error: {filename} line {line}: {match[1]!r} is not an 8-bit binary number")
+                sys.exit(1)
+        words = [match[1] for match in matches]
+        if len(words) > len(self.ram):
+            print(f"Error: {filename} is {len(words)} bytes; RAM holds {len(self.ram)}")
+            sys.exit(1)
+        self.ram[:len(words)] = bytes(int(word, 2) for word in words)
+        self.program_length = len(words)
 
     def ram_read(self, mar):                    # MAR: Memory Address Register
         return self.ram[mar]                    # holds the memory address we're reading or writing
 
     def ram_write(self, mdr, mar):              # MDR: Memory Data Register
-        self.ram[mar] = mdr                     # holds the value to write or the value just read
-
-
-    def execute_HLT(self, operand_a, operand_b):                      # Halt program
-        """Halt the CPU (and exit the emulator)."""
-        # print("HLT")
-        self.halted = True
-
-    def execute_LDI(self, operand_a, operand_b):                     # store value in register
-        """Set the value of a register to an integer."""
-        # print("LDI")
-        self.registers[operand_a] = operand_b
-
-    def execute_PRN(self, operand_a, operand_b):
-        """
-        Print numeric value stored in the given register.
-        Print to the console the decimal integer value that is stored in the given
-        register.
-        """
-        # print("PRN")
-        print(self.registers[operand_a])
-
-    # ALU operations
-    def execute_ADD(self, operand_a, operand_b):
-        # print("ADD")
-        self.alu("ADD", operand_a, operand_b)
-
-    def execute_SUB(self):
-        # print("SUB")
-        self.alu("SUB", operand_a, operand_b)
-
-    def execute_MUL(self, operand_a, operand_b):
-        # print("MUL")
-        self.alu("MUL", operand_a, operand_b)
-
-    def execute_DIV(self, operand_a, operand_b):
-        # print("DIV")
-        self.alu("DIV", operand_a, operand_b)
-
-    # SPRINT
-    def execute_CMP(self, operand_a, operand_b):
-        # print("CMP")
-        if self.registers[operand_a] > self.registers[operand_b]:
-            self.flag = 0b100
-        elif self.registers[operand_a] < self.registers[operand_b]:
-            self.flag = 0b010
-        else:
-            self.flag = 0b001
-
-    # ALU STRETCH
-    def execute_AND(self, operand_a, operand_b):
-        # print("AND")
-        self.alu("AND", operand_a, operand_b)
-
-    def execute_OR(self, operand_a, operand_b):
-        # print("OR")
-        self.alu("OR", operand_a, operand_b)
-
-    def execute_XOR(self, operand_a, operand_b):
-        # print("XOR")
-        self.alu("XOR", operand_a, operand_b)
-
-    def execute_NOT(self, operand_a, operand_b):
-        # print("NOT")
-        self.alu("NOT", operand_a, operand_b)
-
-    def execute_SHL(self, operand_a, operand_b):
-        # print("SHL")
-        self.alu("SHL", operand_a, operand_b)
-
-    def execute_SHR(self, operand_a, operand_b):
-        # print("SHR")
-        self.alu("SHR", operand_a, operand_b)
-
-    def execute_SHL(self, operand_a, operand_b):
-        # print("SHL")
-        self.alu("SHL", operand_a, operand_b)
-
-    def execute_MOD(self, operand_a, operand_b):
-        # print("MOD")
-        self.alu("MOD", operand_a, operand_b)
-
-    # STACK
-    def execute_PUSH(self, operand_a, operand_b):
-        """
-        Push the value in the given register on the stack.
-        1. Decrement the `SP`.
-        2. Copy the value in the given register to the address pointed to by
-        `SP`.
-        """
-        # print("PUSH")
-        self.registers[SP] -= 1                # decrement by 1
-        self.ram_write(self.registers[operand_a], self.registers[SP])
-
-    def execute_POP(self, operand_a, operand_b):
-        """
-        Pop the value at the top of the stack into the given register.
-        1. Copy the value from the address pointed to by `SP` to the given register.
-        2. Increment `SP`.
-        """
-        # print("POP")
-        self.registers[operand_a] = self.ram_read(self.registers[SP])
-        self.registers[SP] += 1
-
-    # SUBROUTINES
-    def execute_CALL(self, operand_a, operand_b):
-        """
-        Calls a subroutine (function) at the address stored in the register.
-
-        1. The address of the ***instruction*** _directly after_ `CALL` is
-        pushed onto the stack. This allows us to return to where we left off
-        when the subroutine finishes executing.
-        2. The PC is set to the address stored in the given register. We jump
-        to that location in RAM and execute the first instruction in the subroutine.
-        The PC can move forward or backwards from its current location.
-        """
-        # print("CALL")
-        self.registers[SP] -= 1
-        # self.ir = self.ram_read(self.pc)
-        # bit_mask = ((self.ir >> 6) & 0b11) + 1
-        self.ram_write(self.pc + 2, self.registers[SP])
-        self.pc = self.registers[operand_a]
-
-    def execute_RET(self, operand_a, operand_b ):
-        """
-        Return from subroutine.
-        Pop the value from the top of the stack and store it in the `PC`.
-        """
-        # print("RET")
-        self.pc = self.ram_read(self.registers[SP])
-        self.registers[SP] += 1
-
-
-    # SPRINT
-    def execute_JMP(self, operand_a, operand_b):
-        """
-        Jump to the address stored in the given register.
-        Set the `PC` to the address stored in the given register.
-        """
-        self.pc = self.registers[operand_a]
-
-    def execute_JEQ(self, operand_a, operand_b):
-        """
-        If `equal` flag is set (true), jump to the address stored in the given register.
-        """
-        if (self.flag & 0b001):
-            self.execute_JMP(operand_a, operand_b)
-        else:
-            self.inst_set_pc = False
-
-    def execute_JNE(self, operand_a, operand_b):
-        if not (self.flag & 0b001):
-            self.execute_JMP(operand_a, operand_b)
-        else:
-            self.inst_set_pc = False
+        self.ram[mar] = mdr & 0xFF              # holds the value to write or the value just read
 
 
     # EXECUTE CODE
     def run(self):
         """Run the CPU."""
-        while not self.halted:
-            self.ir = self.ram_read(self.pc)         # Instruction Register (IR)
-            operand_a = self.ram_read(self.pc + 1)
-            operand_b = self.ram_read(self.pc + 2)
-
-            bit_mask = ((self.ir >> 6) & 0b11) + 1
-            self.inst_set_pc = ((self.ir >> 4) & 0b1) == 1
-
-            if self.ir in self.execute:
-                self.execute[self.ir](operand_a, operand_b)
-            else:
-                print(f"Error: Could not find instruction: {self.ir}")
-                sys.exit(1)
-
-            # exceptions = [CALL, RET, JMP, JEQ, JNE]
-            if not self.inst_set_pc:
-                self.pc += bit_mask
-
-            # self.trace()
+        if self.halted:
+            return
+
+        pc, flag, ir = self.pc, self.flag, None
+        # a compiled run_loop (numba or Cython) beats specialized Python
+        if self.program_length is not None and isinstance(run_loop, FunctionType):
+            # translate RAM as it is now, so writes made since load() count
+            program = specialize(self.ram, self.program_length)
+            # once it runs it may stop matching RAM; never reuse it
+            self.program_length = None
+            pc, flag, ir = program(self.ram, self.registers, pc, flag)
+        if ir is None:
+            # the specialized program bailed out (or there is none)
+            pc, flag, ir = run_loop(self.ram, self.registers, pc, flag)
+
+        self.pc, self.flag, self.ir = pc, flag, ir
+        if self.ir in (DIV, MOD):
+            print(f"Error: Division by zero at address {self.pc}")
+            sys.exit(1)
+        elif self.ir != HLT:
+            print(f"Error: Could not find instruction: {self.ir}")
+            sys.exit(1)
+        self.halted = True
 
     def trace(self):
         """